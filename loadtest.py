@@ -0,0 +1,305 @@
+# Load test for the dashboard: starts one local headless Streamlit server for
+# streamlitapp.py and drives N concurrent sessions against it over its websocket,
+# each running random sidebar interactions. Reports rerun latency (rerun_script
+# sent -> script_finished received), throughput and the server's RSS growth per
+# session count, i.e. how many simultaneous users one server process sustains.
+#
+# Regression gate: record a baseline once on the machine that runs the gate,
+#
+#   python loadtest.py --write-baseline loadtest_baseline.json
+#
+# then compare later runs against it (same --sessions/--steps/--seed):
+#
+#   python loadtest.py --baseline loadtest_baseline.json --max-regression 0.25
+#
+# Exits with status 1 when a session errors, p95 for any session count is more
+# than --max-regression above the baseline, or p95 exceeds --max-p95.
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+
+APP_FILE = "streamlitapp.py"
+SEARCH_TERMS = ["urban", "population", "land", "PM2.5", "electricity", "nothing-matches", ""]
+WIDGET_TYPES = ("selectbox", "slider", "radio", "text_input")
+
+# Function to pick a free local port for the server
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+# Start a headless Streamlit server for the app and wait until it is healthy
+def start_server(port, timeout):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_FILE,
+         "--server.headless", "true",
+         "--server.port", str(port),
+         "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit server exited with status {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"streamlit server did not become healthy within {timeout}s")
+
+# Function to read the resident set size of the server process in MB (Linux only)
+def server_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        return float("nan")
+
+# One simulated browser tab: holds its widget values and reruns the script with them
+class Session:
+    def __init__(self, ws, timeout):
+        self.ws = ws
+        self.timeout = timeout
+        self.widgets = {}
+        self.states = {}
+
+    # Send rerun_script and wait for script_finished, returning the latency
+    async def rerun(self, errors):
+        msg = BackMsg()
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        await asyncio.wait_for(self._read_run(errors), self.timeout)
+        latency = time.perf_counter() - start
+
+        # Like the browser, only keep values for widgets that are still on the page
+        ids = {w.id for w in self.widgets.values()}
+        self.states = {i: state for i, state in self.states.items() if i in ids}
+        return latency
+
+    async def _read_run(self, errors):
+        widgets = {}
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof("type")
+
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in WIDGET_TYPES:
+                    widget = getattr(element, element_type)
+                    widgets[widget.label] = widget
+                elif element_type == "exception" and not element.exception.is_warning:
+                    errors.append(f"{element.exception.type}: {element.exception.message}")
+            elif kind == "script_finished":
+                if fwd.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    errors.append("script finished with a compile error")
+                if fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    self.widgets = widgets
+                    return
+
+    # Function to set the value the next rerun sends for a widget
+    def set_value(self, label, field, value):
+        state = WidgetState(id=self.widgets[label].id)
+        if field == "double_array_value":
+            state.double_array_value.data.extend(value)
+        else:
+            setattr(state, field, value)
+        self.states[state.id] = state
+
+# Sidebar / tab interactions, each picks a random value for one widget
+def change_category(session, rng):
+    box = session.widgets["Select Category"]
+    session.set_value(box.label, "string_value", rng.choice(box.options))
+
+def change_indicator(session, rng):
+    box = session.widgets["Select Indicator"]
+    session.set_value(box.label, "string_value", rng.choice(box.options))
+
+def change_year_range(session, rng):
+    slider = session.widgets["Select Year Range"]
+    start, end = sorted(rng.sample(range(int(slider.min), int(slider.max) + 1), 2))
+    session.set_value(slider.label, "double_array_value", [start, end])
+
+def change_chart_type(session, rng):
+    radio = session.widgets["Chart Type"]
+    session.set_value(radio.label, "string_value", rng.choice(radio.options))
+
+def change_search(session, rng):
+    session.set_value("Search Indicator", "string_value", rng.choice(SEARCH_TERMS))
+
+def change_snapshot_year(session, rng):
+    slider = session.widgets["Select Year for Snapshot"]
+    session.set_value(slider.label, "double_array_value", [rng.randint(int(slider.min), int(slider.max))])
+
+INTERACTIONS = [
+    change_category,
+    change_indicator,
+    change_year_range,
+    change_chart_type,
+    change_search,
+    change_snapshot_year,
+]
+
+# Simulate one dashboard session: first load, then random sidebar interactions
+async def run_session(session, seed, steps, latencies, errors):
+    rng = random.Random(seed)
+    try:
+        latencies.append(await session.rerun(errors))
+        for _ in range(steps):
+            rng.choice(INTERACTIONS)(session, rng)
+            latencies.append(await session.rerun(errors))
+    except Exception as e:
+        errors.append(f"{type(e).__name__}: {e or 'rerun timed out'}")
+
+# Run `sessions` concurrent sessions against the server and collect
+# latency/throughput figures plus the server's RSS growth while they are connected
+async def run_level(url, server_pid, sessions, steps, timeout, seed):
+    latencies = []
+    errors = []
+    rss_before = server_rss_mb(server_pid)
+
+    async with contextlib.AsyncExitStack() as stack:
+        connections = [
+            await stack.enter_async_context(connect(url, subprotocols=["streamlit"], max_size=None))
+            for _ in range(sessions)
+        ]
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            run_session(Session(ws, timeout), seed + i, steps, latencies, errors)
+            for i, ws in enumerate(connections)
+        ])
+        elapsed = time.perf_counter() - start
+        # Measure before disconnecting, so per-session state is still held
+        rss_growth = server_rss_mb(server_pid) - rss_before
+
+    if latencies:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    else:
+        p50 = p95 = p99 = float("nan")
+        errors.append("no reruns completed")
+
+    return {
+        'sessions': sessions,
+        'reruns': len(latencies),
+        'p50': p50,
+        'p95': p95,
+        'p99': p99,
+        'throughput': len(latencies) / elapsed,
+        'rss_growth': rss_growth,
+        'errors': errors,
+    }
+
+async def run_levels(args):
+    port = free_port()
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    server = start_server(port, args.timeout)
+    try:
+        # Warm up the server (imports, st.cache_data, snapshots) with one session
+        await run_level(url, server.pid, 1, 0, args.timeout, args.seed)
+        return [
+            await run_level(url, server.pid, sessions, args.steps, args.timeout, args.seed)
+            for sessions in args.sessions
+        ]
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drive concurrent sessions against one local Streamlit server "
+                    "and report rerun latency, throughput and server RSS growth."
+    )
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="concurrent session counts to test (default: 1 2 4 8)")
+    parser.add_argument("--steps", type=int, default=20,
+                        help="interactions per session (default: 20)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed for the interaction sequences")
+    parser.add_argument("--timeout", type=float, default=60,
+                        help="server start-up and per-rerun timeout in seconds (default: 60)")
+    parser.add_argument("--max-p95", type=float, default=None,
+                        help="fail (exit 1) if any level's p95 latency exceeds this many seconds")
+    parser.add_argument("--baseline", default=None,
+                        help="baseline JSON from --write-baseline to compare p95 against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed p95 increase over the baseline as a fraction (default: 0.25)")
+    parser.add_argument("--write-baseline", default=None,
+                        help="write this run's results to a baseline JSON file")
+    args = parser.parse_args()
+
+    # The app reads its data files relative to its own directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if (baseline['steps'], baseline['seed']) != (args.steps, args.seed):
+            print(f"warning: baseline was recorded with --steps {baseline['steps']} "
+                  f"--seed {baseline['seed']}")
+
+    results = asyncio.run(run_levels(args))
+
+    print(f"{'sessions':>8} {'reruns':>7} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} "
+          f"{'reruns/s':>9} {'RSS MB':>8} {'RSS MB/session':>15}")
+
+    failed = False
+    for result in results:
+        print(f"{result['sessions']:>8} {result['reruns']:>7} {result['p50']:>8.3f} "
+              f"{result['p95']:>8.3f} {result['p99']:>8.3f} {result['throughput']:>9.2f} "
+              f"{result['rss_growth']:>8.2f} {result['rss_growth'] / result['sessions']:>15.2f}")
+
+        if result['errors']:
+            failed = True
+            print(f"  {len(result['errors'])} errors, first: {result['errors'][0]}")
+        if args.max_p95 is not None and not result['p95'] <= args.max_p95:
+            failed = True
+            print(f"  p95 {result['p95']:.3f}s exceeds --max-p95 {args.max_p95:.3f}s")
+        if baseline is not None:
+            base = baseline['levels'].get(str(result['sessions']))
+            if base is None:
+                print("  no baseline for this session count")
+            elif not result['p95'] <= base['p95'] * (1 + args.max_regression):
+                failed = True
+                print(f"  p95 {result['p95']:.3f}s regressed more than "
+                      f"{args.max_regression:.0%} over baseline {base['p95']:.3f}s")
+
+    if args.write_baseline:
+        if failed:
+            print("not writing a baseline from a failing run")
+        else:
+            levels = {
+                str(result['sessions']): {
+                    key: float(result[key]) for key in ('p50', 'p95', 'p99', 'throughput', 'rss_growth')
+                }
+                for result in results
+            }
+            with open(args.write_baseline, 'w', encoding='utf-8') as f:
+                json.dump({'steps': args.steps, 'seed': args.seed, 'levels': levels}, f, indent=2)
+            print(f"Wrote baseline to {args.write_baseline}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
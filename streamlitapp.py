@@ -4,6 +4,14 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from io import BytesIO
+import hashlib
+import json
+import os
+import sys
+
+DATA_FILE = "cleaned_urban_data.csv"
+SNAPSHOT_DIR = "snapshots"
+SNAPSHOT_MANIFEST = os.path.join(SNAPSHOT_DIR, "manifest.json")
 
 # Set page configuration
 st.set_page_config(
@@ -51,7 +59,7 @@ div.block-container::before {
 def load_data():
     # In a real scenario, you'd upload and read your CSV file
     # Since you've uploaded a file, we'll create a placeholder for the data structure
-    df=pd.read_csv("cleaned_urban_data.csv")
+    df=pd.read_csv(DATA_FILE)
     return df
 
 # Function to categorize indicators
@@ -103,6 +111,217 @@ def format_value(value, indicator):
             return f"{value:,.0f}"
         return f"{value:.2f}"
 
+# Function to build the historical trend chart of a category (Overview tab)
+def build_overview_figure(filtered_data, category, categories):
+    # Get all data for this category between the year range
+    historical_data = filtered_data[filtered_data['Indicator Name'].isin(categories[category])]
+
+    if historical_data.empty:
+        return None
+
+    # Create a line chart for all indicators in this category
+    pivot_data = historical_data.pivot_table(
+        index='Year',
+        columns='Indicator Name',
+        values='Value'
+    ).reset_index()
+
+    fig = go.Figure()
+
+    for indicator in categories[category]:
+        if indicator in pivot_data.columns:
+            fig.add_trace(
+                go.Scatter(
+                    x=pivot_data['Year'],
+                    y=pivot_data[indicator],
+                    mode='lines+markers',
+                    name=indicator
+                )
+            )
+
+    fig.update_layout(
+        title=f"{category} Indicators Over Time",
+        xaxis_title="Year",
+        yaxis_title="Value",
+        height=400,
+        template='plotly_white',
+        legend_title="Indicator"
+    )
+    return fig
+
+# Function to build the trend chart of a single indicator (Indicator Trend tab)
+def build_trend_figure(indicator_data, selected_indicator, year_range, chart_type):
+    if indicator_data.empty:
+        return None
+
+    # Prepare data for plotting
+    plot_data = indicator_data[['Year', 'Value']].copy()
+    plot_data['Year'] = plot_data['Year'].astype(int)
+
+    # Create plot based on selected chart type
+    if chart_type == "Line":
+        fig = px.line(
+            plot_data,
+            x='Year',
+            y='Value',
+            title=f"{selected_indicator} ({year_range[0]}-{year_range[1]})",
+            markers=True
+        )
+    else:
+        fig = px.bar(
+            plot_data,
+            x='Year',
+            y='Value',
+            title=f"{selected_indicator} ({year_range[0]}-{year_range[1]})"
+        )
+
+    # Customize y-axis title based on indicator
+    if "%" in selected_indicator:
+        fig.update_layout(yaxis_title="Percentage (%)")
+    elif "sq. km" in selected_indicator:
+        fig.update_layout(yaxis_title="Area (sq. km)")
+    else:
+        fig.update_layout(yaxis_title="Value")
+
+    # Custom tooltip to show formatted values
+    fig.update_traces(
+        hovertemplate='<b>Year</b>: %{x}<br><b>Value</b>: %{y:,.2f}<extra></extra>'
+    )
+
+    # Improve layout
+    fig.update_layout(
+        xaxis_title="Year",
+        height=500,
+        template='plotly_white',
+        hovermode='x unified'
+    )
+    return fig
+
+# Function to compute the KPI table (label, formatted value, delta) of a category
+def compute_kpis(filtered_data, latest_year, category, categories):
+    # Filter data for the latest year and selected category
+    summary_data = filtered_data[
+        (filtered_data['Year'] == latest_year) &
+        (filtered_data['Indicator Name'].isin(categories[category]))
+    ]
+
+    if summary_data.empty:
+        return []
+
+    kpis = []
+    for indicator in categories[category]:
+        indicator_value = summary_data[summary_data['Indicator Name'] == indicator]['Value'].values
+
+        if len(indicator_value) == 0:
+            kpis.append({'label': indicator, 'value': "No data", 'delta': None})
+            continue
+
+        # Get previous year data for delta calculation
+        prev_year_data = filtered_data[
+            (filtered_data['Year'] == latest_year - 1) &
+            (filtered_data['Indicator Name'] == indicator)
+        ]
+
+        delta_formatted = None
+        if not prev_year_data.empty:
+            prev_value = prev_year_data['Value'].values[0]
+            delta = indicator_value[0] - prev_value
+            # Format delta for percentage indicators
+            if "%" in indicator:
+                delta_formatted = f"{delta:.2f}%"
+            else:
+                delta_formatted = f"{delta:.2f}"
+
+        kpis.append({
+            'label': indicator,
+            'value': format_value(indicator_value[0], indicator),
+            'delta': delta_formatted
+        })
+    return kpis
+
+# Function to build the lookup key of a pre-rendered snapshot
+def snapshot_key(kind, name, year_range, chart_type=None):
+    key = f"{kind}|{name}|{year_range[0]}-{year_range[1]}"
+    if chart_type is not None:
+        key += f"|{chart_type}"
+    return key
+
+# Function to fingerprint the dataset, so stale snapshots are never served
+def data_fingerprint():
+    with open(DATA_FILE, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+# Function to version the snapshots by the modification times of the manifest and
+# the dataset, so a rebuild or a new CSV is picked up without a server restart
+def snapshot_version():
+    try:
+        return os.path.getmtime(SNAPSHOT_MANIFEST), os.path.getmtime(DATA_FILE)
+    except OSError:
+        return None
+
+# Load pre-rendered snapshots (empty when not built or built from other data).
+# Snapshots are only a speed-up: anything unreadable falls back to the live pipeline.
+@st.cache_resource(max_entries=1)
+def load_snapshots(version):
+    if version is None:
+        return {}
+    try:
+        with open(SNAPSHOT_MANIFEST, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('source') != data_fingerprint():
+            return {}
+        artifacts = list(manifest['artifacts'].items())
+    except (OSError, ValueError, KeyError, AttributeError):
+        return {}
+
+    snapshots = {}
+    for key, file_name in artifacts:
+        try:
+            with open(os.path.join(SNAPSHOT_DIR, file_name), encoding='utf-8') as f:
+                snapshots[key] = json.load(f)
+        except (OSError, ValueError, TypeError):
+            # Skip the bad artifact, that view is rendered live instead
+            continue
+    return snapshots
+
+# Build command: pre-render the default (full year range) views into SNAPSHOT_DIR
+def build_snapshots():
+    data = load_data()
+    data = data[data['Country Name'] == 'Sri Lanka']
+
+    year_range = (int(data['Year'].min()), int(data['Year'].max()))
+    categories, _ = categorize_indicators(data['Indicator Name'].unique().tolist())
+    latest_year = int(data['Year'].max())
+
+    artifacts = {}
+    for category in categories:
+        overview_fig = build_overview_figure(data, category, categories)
+        if overview_fig is not None:
+            artifacts[snapshot_key('overview', category, year_range)] = json.loads(overview_fig.to_json())
+        artifacts[snapshot_key('kpi', category, year_range)] = compute_kpis(data, latest_year, category, categories)
+
+        for indicator in categories[category]:
+            indicator_data = data[data['Indicator Name'] == indicator].sort_values('Year')
+            for chart_type in ["Line", "Bar"]:
+                trend_fig = build_trend_figure(indicator_data, indicator, year_range, chart_type)
+                if trend_fig is not None:
+                    artifacts[snapshot_key('trend', indicator, year_range, chart_type)] = json.loads(trend_fig.to_json())
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    manifest = {'source': data_fingerprint(), 'artifacts': {}}
+    for key, artifact in artifacts.items():
+        file_name = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + ".json"
+        with open(os.path.join(SNAPSHOT_DIR, file_name), 'w', encoding='utf-8') as f:
+            json.dump(artifact, f)
+        manifest['artifacts'][key] = file_name
+
+    # Write the manifest last and atomically, so it never points at missing artifacts
+    manifest_tmp = SNAPSHOT_MANIFEST + ".tmp"
+    with open(manifest_tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_tmp, SNAPSHOT_MANIFEST)
+    print(f"Wrote {len(artifacts)} snapshots to {SNAPSHOT_DIR}/")
+
 # Custom CSS for styling
 def apply_custom_css():
     st.markdown("""
@@ -278,7 +497,10 @@ def main():
     
     # Toggle for chart type
     chart_type = st.sidebar.radio("Chart Type", ["Line", "Bar"])
-    
+
+    # Pre-rendered artifacts from `python streamlitapp.py --build-snapshots`
+    snapshots = load_snapshots(snapshot_version())
+
     # Main content area (Tabs)
     tab0, tab1, tab2, tab3, tab4 = st.tabs([
         "Overview",
@@ -310,61 +532,29 @@ def main():
             with overview_tabs[i]:
                 st.markdown(f'<div class="category-header"><h3>{category} Indicators Overview</h3></div>', unsafe_allow_html=True)
                 
-                # Filter data for this category and latest year
-                cat_data = latest_year_data[latest_year_data['Indicator Name'].isin(categories[category])]
+                # Serve the pre-rendered KPI table when one matches the filters
+                kpis = snapshots.get(snapshot_key('kpi', category, year_range))
+                if kpis is None:
+                    kpis = compute_kpis(filtered_data, latest_year, category, categories)
                 
-                if not cat_data.empty:
+                if kpis:
                     # Create metrics display
-                    for j, indicator in enumerate(categories[category]):
-                        indicator_value = cat_data[cat_data['Indicator Name'] == indicator]['Value'].values
-                        if len(indicator_value) > 0:
-                            formatted_value = format_value(indicator_value[0], indicator)
-                            st.metric(
-                                label=indicator,
-                                value=formatted_value
-                            )
-                        else:
-                            st.metric(
-                                label=indicator,
-                                value="No data"
-                            )
+                    for kpi in kpis:
+                        st.metric(
+                            label=kpi['label'],
+                            value=kpi['value']
+                        )
                             
                     # Show some historical trends for this category
                     st.subheader(f"Historical Trends ({category})")
                     
-                    # Get all data for this category between the year range
-                    historical_data = filtered_data[filtered_data['Indicator Name'].isin(categories[category])]
+                    fig = snapshots.get(snapshot_key('overview', category, year_range))
+                    if fig is not None:
+                        fig = go.Figure(fig)
+                    else:
+                        fig = build_overview_figure(filtered_data, category, categories)
                     
-                    if not historical_data.empty:
-                        # Create a line chart for all indicators in this category
-                        pivot_data = historical_data.pivot_table(
-                            index='Year',
-                            columns='Indicator Name',
-                            values='Value'
-                        ).reset_index()
-                        
-                        fig = go.Figure()
-                        
-                        for indicator in categories[category]:
-                            if indicator in pivot_data.columns:
-                                fig.add_trace(
-                                    go.Scatter(
-                                        x=pivot_data['Year'], 
-                                        y=pivot_data[indicator],
-                                        mode='lines+markers',
-                                        name=indicator
-                                    )
-                                )
-                        
-                        fig.update_layout(
-                            title=f"{category} Indicators Over Time",
-                            xaxis_title="Year",
-                            yaxis_title="Value",
-                            height=400,
-                            template='plotly_white',
-                            legend_title="Indicator"
-                        )
-                        
+                    if fig is not None:
                         st.plotly_chart(fig, use_container_width=True)
                 else:
                     st.warning(f"No data available for {category} indicators in {latest_year}.")
@@ -418,49 +608,13 @@ def main():
     with tab1:
         st.header(f"Trend of {selected_indicator} ({year_range[0]}-{year_range[1]})")
         
-        if not indicator_data.empty:
-            # Prepare data for plotting
-            plot_data = indicator_data[['Year', 'Value']].copy()
-            plot_data['Year'] = plot_data['Year'].astype(int)
-            
-            # Create plot based on selected chart type
-            if chart_type == "Line":
-                fig = px.line(
-                    plot_data, 
-                    x='Year', 
-                    y='Value',
-                    title=f"{selected_indicator} ({year_range[0]}-{year_range[1]})",
-                    markers=True
-                )
-            else:
-                fig = px.bar(
-                    plot_data, 
-                    x='Year', 
-                    y='Value',
-                    title=f"{selected_indicator} ({year_range[0]}-{year_range[1]})"
-                )
-            
-            # Customize y-axis title based on indicator
-            if "%" in selected_indicator:
-                fig.update_layout(yaxis_title="Percentage (%)")
-            elif "sq. km" in selected_indicator:
-                fig.update_layout(yaxis_title="Area (sq. km)")
-            else:
-                fig.update_layout(yaxis_title="Value")
-            
-            # Custom tooltip to show formatted values
-            fig.update_traces(
-                hovertemplate='<b>Year</b>: %{x}<br><b>Value</b>: %{y:,.2f}<extra></extra>'
-            )
-            
-            # Improve layout
-            fig.update_layout(
-                xaxis_title="Year",
-                height=500,
-                template='plotly_white',
-                hovermode='x unified'
-            )
-            
+        fig = snapshots.get(snapshot_key('trend', selected_indicator, year_range, chart_type))
+        if fig is not None:
+            fig = go.Figure(fig)
+        else:
+            fig = build_trend_figure(indicator_data, selected_indicator, year_range, chart_type)
+        
+        if fig is not None:
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.warning(f"No data available for {selected_indicator} in the selected year range.")
@@ -575,51 +729,25 @@ def main():
         ]
         
         if not summary_data.empty:
-            # Create columns based on the number of indicators
-            num_indicators = len(categories[selected_category])
+            # Serve the pre-rendered KPI table when one matches the filters
+            kpis = snapshots.get(snapshot_key('kpi', selected_category, year_range))
+            if kpis is None:
+                kpis = compute_kpis(filtered_data, latest_year, selected_category, categories)
+            
             cols_per_row = 3  # Number of columns per row
             
             # Create metrics in rows with multiple columns
-            for i in range(0, num_indicators, cols_per_row):
+            for i in range(0, len(kpis), cols_per_row):
                 cols = st.columns(cols_per_row)
                 
-                for j in range(cols_per_row):
-                    if i + j < num_indicators:
-                        indicator = categories[selected_category][i + j]
-                        indicator_value = summary_data[summary_data['Indicator Name'] == indicator]['Value'].values
-                        
-                        if len(indicator_value) > 0:
-                            formatted_value = format_value(indicator_value[0], indicator)
-                            
-                            # Get previous year data for delta calculation
-                            prev_year_data = filtered_data[
-                                (filtered_data['Year'] == latest_year - 1) & 
-                                (filtered_data['Indicator Name'] == indicator)
-                            ]
-                            
-                            delta = None
-                            if not prev_year_data.empty:
-                                prev_value = prev_year_data['Value'].values[0]
-                                delta = indicator_value[0] - prev_value
-                                # Format delta for percentage indicators
-                                if "%" in indicator:
-                                    delta_formatted = f"{delta:.2f}%"
-                                else:
-                                    delta_formatted = f"{delta:.2f}"
-                            
-                            with cols[j]:
-                                st.metric(
-                                    label=indicator,
-                                    value=formatted_value,
-                                    delta=delta_formatted if delta is not None else None,
-                                    delta_color="normal"
-                                )
-                        else:
-                            with cols[j]:
-                                st.metric(
-                                    label=indicator,
-                                    value="No data"
-                                )
+                for j, kpi in enumerate(kpis[i:i + cols_per_row]):
+                    with cols[j]:
+                        st.metric(
+                            label=kpi['label'],
+                            value=kpi['value'],
+                            delta=kpi['delta'],
+                            delta_color="normal"
+                        )
             
             # Add a radar chart for category overview
             st.subheader(f"Radar Chart Overview of {selected_category} Indicators")
@@ -693,4 +821,7 @@ def main():
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if "--build-snapshots" in sys.argv:
+        build_snapshots()
+    else:
+        main()
\ No newline at end of file